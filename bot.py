@@ -1,16 +1,22 @@
 import os
 import html
+import threading
 import psycopg2
+import psycopg2.extensions
 import asyncio
+from contextlib import contextmanager
 from types import SimpleNamespace
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time, timedelta, timezone
+from time import monotonic
 from zoneinfo import ZoneInfo
-from typing import List, Tuple, Optional, Set, Dict
+from typing import List, Tuple, Optional, Set, Dict, FrozenSet
 
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
-from telegram.error import BadRequest, Forbidden
+from telegram.error import BadRequest, Forbidden, RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -30,6 +36,13 @@ DATABASE_URL = os.environ["DATABASE_URL"]
 TZ_NAME = os.environ.get("TZ", "Asia/Tehran")
 TZ = ZoneInfo(TZ_NAME)
 
+# Max concurrent DB calls: sizes both the connection pool and its executor
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_IDLE_TX_TIMEOUT_MS = int(os.environ.get("DB_IDLE_TX_TIMEOUT_MS", "10000"))
+# Updates handled at once; DB work beyond DB_POOL_SIZE queues on the executor
+CONCURRENT_UPDATES = int(os.environ.get("CONCURRENT_UPDATES", "64"))
+
 def _parse_csv(env_val: Optional[str]) -> List[str]:
     if not env_val:
         return []
@@ -50,12 +63,48 @@ def _parse_admin_ids(raw: str) -> Set[int]:
 def _parse_admin_usernames(raw: str) -> Set[str]:
     return {tok.lower().lstrip("@") for tok in _parse_csv(raw)}
 
-# Bootstrap admins from ENV (protected)
-ADMINS_BY_ID: Set[int] = _parse_admin_ids(_ADMIN_IDS_ENV)
-ADMINS_BY_USERNAME: Set[str] = _parse_admin_usernames(_ADMIN_USERNAMES_ENV)
+# Bootstrap admins from ENV (protected); immutable for O(1) hashed lookups
+ADMINS_BY_ID: FrozenSet[int] = frozenset(_parse_admin_ids(_ADMIN_IDS_ENV))
+ADMINS_BY_USERNAME: FrozenSet[str] = frozenset(_parse_admin_usernames(_ADMIN_USERNAMES_ENV))
 
 # Thread pool for blocking DB calls
-EXECUTOR = ThreadPoolExecutor(max_workers=8)
+EXECUTOR = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+# Shared Postgres connections, opened in _post_init (one per executor worker)
+POOL: Optional[ThreadedConnectionPool] = None
+
+# Short-lived per-user (pending_count, pending preview) for the user-detail
+# card; task-list pages are never cached
+TASKS_CACHE_TTL = 2.0
+
+# Users whose row is known to match their current profile; skips the upsert
+SEEN_USERS_TTL = 3600.0
+
+# Admin-facing aggregates (global stats, user count) may be this many seconds stale
+STATS_CACHE_TTL = 30.0
+
+# Pending tasks listed on the admin user-detail card
+PENDING_PREVIEW_LIMIT = 40
+
+# Bulk sends (reminders, daily reports) stay under Telegram's ~30 msg/s global cap
+SEND_RATE_PER_SEC = 25.0
+
+# Per-user settings; only this process writes them, so they can live a while
+SETTINGS_CACHE_TTL = 300.0
+
+# DB-admin membership; grants/revokes through the bot invalidate immediately
+ADMIN_CACHE_TTL = 300.0
+
+# Retries per bulk send after Telegram answers 429 (RetryAfter)
+SEND_MAX_RETRIES = 3
+
+# Bulk sends kept in flight at once; the limiter above still caps the rate
+SEND_CONCURRENCY = 10
+
+# Task list page size (keeps messages well under Telegram's 4096-char cap)
+TASKS_PER_PAGE = 10
+# Task text shown per row in the task list; longer texts are clipped with …
+TASK_TEXT_CLIP = 300
 
 # =============================
 # Utils
@@ -67,6 +116,89 @@ def is_admin_env(user_id: int, username: Optional[str]) -> bool:
         return True
     return False
 
+class TTLCache:
+    """Small thread-safe map whose entries expire `ttl` seconds after being stored."""
+
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[object, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+        # Invalidation counters for put_if_unchanged: pop() bumps the key's,
+        # clear() (or trimming _gens) bumps the epoch
+        self._epoch = 0
+        self._gens: Dict[object, int] = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            if item[0] <= monotonic():
+                del self._data[key]
+                return default
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key, value):
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (monotonic() + self.ttl, value)
+
+    def generation(self, key):
+        """Token for put_if_unchanged; a later pop(key) or clear() invalidates it."""
+        with self._lock:
+            return self._epoch, self._gens.get(key, 0)
+
+    def put_if_unchanged(self, key, value, token) -> bool:
+        """Store `value` only if `key` wasn't invalidated since `token` was taken."""
+        with self._lock:
+            if (self._epoch, self._gens.get(key, 0)) != token:
+                return False
+            self._put(key, value)
+            return True
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._gens) >= self.maxsize:
+                # Bounded: restarting the epoch invalidates every outstanding token
+                self._gens.clear()
+                self._epoch += 1
+            self._gens[key] = self._gens.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._gens.clear()
+            self._epoch += 1
+
+class RateLimiter:
+    """Async limiter that spaces acquisitions at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            # Re-check after each sleep: a pause() may have pushed the deadline out
+            while (wait := self._next - monotonic()) > 0:
+                await asyncio.sleep(wait)
+            self._next = monotonic() + self._interval
+
+    def pause(self, seconds: float):
+        """Hold back every later acquisition for at least `seconds`."""
+        self._next = max(self._next, monotonic() + seconds)
+
+SEND_LIMITER = RateLimiter(SEND_RATE_PER_SEC)
+
 def esc(s: Optional[str]) -> str:
     return html.escape(s or "")
 
@@ -76,21 +208,53 @@ def clip(s: str, n: int) -> str:
 def _clamp_hour(h: int) -> int:
     return max(0, min(24, h))
 
-def _within_hours(local_dt: datetime, start_h: int, end_h: int) -> bool:
-    """Return True if local time is within [start_h, end_h) with wrap-around and 24/7 support."""
-    h = local_dt.hour
-    if start_h == 0 and end_h == 24:
-        return True
-    start_h = _clamp_hour(start_h)
-    end_h = _clamp_hour(end_h)
-    if start_h == end_h:
-        return False
-    if start_h < end_h:
-        return start_h <= h < end_h
-    return h >= start_h or h < end_h
+async def send_throttled(bot, chat_id: int, text: str, **kwargs):
+    """
+    bot.send_message for bulk jobs, paced by the global SEND_LIMITER.
+    On a 429 the whole limiter backs off for retry_after and the send is retried.
+    """
+    for attempt in range(SEND_MAX_RETRIES + 1):
+        await SEND_LIMITER.acquire()
+        try:
+            return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        except RetryAfter as e:
+            if attempt == SEND_MAX_RETRIES:
+                raise
+            SEND_LIMITER.pause(float(e.retry_after) + 0.1)
+
+async def send_many(bot, messages: List[Tuple[int, str]], **kwargs):
+    """
+    Send (chat_id, text) pairs concurrently (at most SEND_CONCURRENCY in flight),
+    paced by SEND_LIMITER. Chats that blocked the bot, reject the message or stay
+    rate-limited past the retries are skipped.
+    """
+    sem = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def send_one(chat_id: int, text: str):
+        async with sem:
+            try:
+                await send_throttled(bot, chat_id, text, **kwargs)
+            except (Forbidden, BadRequest, RetryAfter):
+                pass
+
+    await asyncio.gather(*(send_one(chat_id, text) for chat_id, text in messages))
 
 async def safe_edit_or_send(update: Update, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None, message=None):
-    """Edit an existing message or send a new one; tolerate BadRequest from Telegram quirks."""
+    """
+    Edit an existing message or send a new one; tolerate BadRequest from Telegram quirks.
+    Interactive replies skip the SEND_LIMITER queue, but a 429 still backs the
+    limiter off (so running broadcasts yield) and the reply is retried once.
+    """
+    for attempt in range(2):
+        try:
+            return await _edit_or_send(update, text, reply_markup, message)
+        except RetryAfter as e:
+            if attempt:
+                raise
+            SEND_LIMITER.pause(float(e.retry_after) + 0.1)
+            await asyncio.sleep(float(e.retry_after))
+
+async def _edit_or_send(update: Update, text: str, reply_markup: Optional[InlineKeyboardMarkup], message):
     try:
         if message:
             await message.edit_text(
@@ -117,230 +281,627 @@ async def safe_edit_or_send(update: Update, text: str, reply_markup: Optional[In
 # =============================
 # DB (sync) -> run in executor
 # =============================
-def _get_conn():
-    # Many hosted Postgres providers require SSL
-    return psycopg2.connect(DATABASE_URL, sslmode="require")
-
-def _init_db_sync():
-    """Create/upgrade schema in a migration-safe order."""
-    with _get_conn() as conn, conn.cursor() as c:
-        # Core tables
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users(
-                user_id BIGINT PRIMARY KEY,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                registered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """
+_TASKS_CACHE = TTLCache(TASKS_CACHE_TTL)
+_SEEN_USERS = TTLCache(SEEN_USERS_TTL, maxsize=5_000)
+_STATS_CACHE = TTLCache(STATS_CACHE_TTL)
+_SETTINGS_CACHE = TTLCache(SETTINGS_CACHE_TTL)
+_ADMIN_CACHE = TTLCache(ADMIN_CACHE_TTL)
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements it has PREPAREd."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+
+# Hot statements, PREPAREd once per pooled connection ($n placeholders)
+_PREPARED_SQL: Dict[str, str] = {
+    # Upserts the user and ensures the settings row in one statement; the FK on
+    # user_settings is checked at statement end, after the sibling CTE's insert.
+    "ensure_user": """
+        WITH u AS (
+            INSERT INTO users (user_id, username, first_name, last_name)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (user_id) DO UPDATE SET
+                username = EXCLUDED.username,
+                first_name = EXCLUDED.first_name,
+                last_name = EXCLUDED.last_name
+            RETURNING user_id, task_count - done_count AS pending
+        ), s AS (
+            INSERT INTO user_settings (user_id)
+            SELECT user_id FROM u
+            ON CONFLICT (user_id) DO NOTHING
         )
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tasks(
-                task_id SERIAL PRIMARY KEY,
-                admin_id BIGINT,
-                user_id BIGINT REFERENCES users(user_id) ON DELETE CASCADE,
-                task_text TEXT,
-                is_done BOOLEAN DEFAULT FALSE,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """
+        SELECT pending FROM u
+    """,
+    "add_task": "INSERT INTO tasks (admin_id, user_id, task_text) VALUES ($1, $2, $3)",
+    # SET expressions see the pre-update row, so CASE tests the old is_done.
+    # completed_at is stored in UTC so we can reliably convert to local when reporting.
+    "toggle_task": """
+        UPDATE tasks
+        SET is_done = NOT is_done,
+            completed_at = CASE WHEN is_done THEN NULL ELSE NOW() AT TIME ZONE 'UTC' END
+        WHERE task_id = $1 AND user_id = $2
+    """,
+    # Count and preview in one statement, so both come from the same snapshot
+    "user_pending_preview": """
+        SELECT u.task_count - u.done_count,
+               (SELECT COALESCE(json_agg(json_build_array(p.task_id, p.task_text) ORDER BY p.task_id DESC), '[]')
+                FROM (
+                    SELECT task_id, task_text
+                    FROM tasks
+                    WHERE user_id = $1 AND NOT is_done
+                    ORDER BY task_id DESC
+                    LIMIT $2
+                ) p)
+        FROM users u
+        WHERE u.user_id = $1
+    """,
+    # Keyset pages: task_id is a SERIAL assigned at insert, so it follows
+    # creation order and makes a stable, delete-proof cursor. Text is cut to one
+    # char past TASK_TEXT_CLIP: enough for clip() to add the ellipsis, no more.
+    "task_page_first": f"""
+        SELECT task_id, LEFT(task_text, {TASK_TEXT_CLIP + 1}), is_done, created_date
+        FROM tasks
+        WHERE user_id = $1
+        ORDER BY task_id DESC
+        LIMIT $2
+    """,
+    "task_page_from": f"""
+        SELECT task_id, LEFT(task_text, {TASK_TEXT_CLIP + 1}), is_done, created_date
+        FROM tasks
+        WHERE user_id = $1 AND task_id <= $2
+        ORDER BY task_id DESC
+        LIMIT $3
+    """,
+    "task_page_prev": """
+        SELECT MAX(task_id) FROM (
+            SELECT task_id FROM tasks
+            WHERE user_id = $1 AND task_id > $2
+            ORDER BY task_id ASC
+            LIMIT $3
+        ) newer
+    """,
+    "user_counts": "SELECT task_count, done_count FROM users WHERE user_id = $1",
+    "is_admin_db": "SELECT 1 FROM admins WHERE user_id = $1",
+}
+
+def _execute_prepared(c, name: str, params: tuple):
+    """Run a statement from _PREPARED_SQL, preparing it on first use per connection."""
+    conn = c.connection
+    if name not in conn.prepared:
+        c.execute(f"PREPARE {name} AS {_PREPARED_SQL[name]}")
+        conn.prepared.add(name)
+    c.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+def _open_pool_sync():
+    global POOL
+    if POOL is None:
+        # Many hosted Postgres providers require SSL
+        # TCP keepalives stop idle pooled connections from being dropped by
+        # NATs/proxies, so we don't pay a fresh TLS handshake to reconnect.
+        # minconn = maxconn: psycopg2 closes any returned connection beyond
+        # minconn, which would force a reconnect (and lose its PREPAREs) per checkout
+        POOL = ThreadedConnectionPool(
+            DB_POOL_SIZE, DB_POOL_SIZE, DATABASE_URL,
+            sslmode="require",
+            keepalives=1,
+            keepalives_idle=30,
+            keepalives_interval=10,
+            keepalives_count=5,
+            application_name="todo_bot",
+            # Bound runaway queries and abandoned transactions server-side
+            options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} -c idle_in_transaction_session_timeout={DB_IDLE_TX_TIMEOUT_MS}",
+            connection_factory=_PooledConnection,
         )
-        # Add new columns idempotently BEFORE creating indexes that depend on them
-        c.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS is_daily BOOLEAN DEFAULT TRUE;")
-        c.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS last_reset DATE DEFAULT CURRENT_DATE;")
-        c.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP NULL;")
 
-        # Settings table for per-user preferences
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_settings(
-                user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
-                mute_reminders BOOLEAN DEFAULT FALSE,
-                work_start SMALLINT DEFAULT 9,   -- inclusive, 0..23
-                work_end SMALLINT DEFAULT 21     -- exclusive, 1..24 (24 means 24/7 with start=0)
-            );
-            """
-        )
+def _close_pool_sync():
+    global POOL
+    if POOL is not None:
+        POOL.closeall()
+        POOL = None
 
-        # Dynamic admins table (separate from ENV)
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS admins(
-                user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
-                added_by BIGINT,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-        )
+@contextmanager
+def _get_conn(readonly: bool = False):
+    """
+    Borrow a pooled connection; commit on success, roll back on error.
+    readonly=True runs the block in autocommit, skipping the BEGIN and COMMIT
+    round-trips around pure SELECTs. Under READ COMMITTED every statement takes
+    its own snapshot anyway, so multi-statement reads see the same data.
+    """
+    # psycopg2 can't tell an idle connection was dropped until it is used; TCP
+    # keepalives (see _open_pool_sync) keep NATs/proxies from dropping them, and
+    # one that does die is discarded below after its first failed query.
+    conn = POOL.getconn()
+    if readonly:
+        conn.autocommit = True
+    try:
+        yield conn
+        if not readonly:
+            conn.commit()
+    except Exception:
+        if not conn.closed and not readonly:
+            conn.rollback()
+        raise
+    finally:
+        if readonly and not conn.closed:
+            conn.autocommit = False
+        # Drop connections the server closed so the pool reconnects
+        POOL.putconn(conn, close=bool(conn.closed))
+
+def _init_db_sync():
+    """
+    Create/upgrade schema in a migration-safe order. The statements are sent as
+    one batch (one round-trip, one transaction), so each must end with ';'.
+    """
+    ddl: List[str] = []
+    # Migrations and counter backfills may legitimately run long
+    ddl.append("SET LOCAL statement_timeout = 0;")
+
+    # Core tables
+    ddl.append(
+        """
+        CREATE TABLE IF NOT EXISTS users(
+            user_id BIGINT PRIMARY KEY,
+            username TEXT,
+            first_name TEXT,
+            last_name TEXT,
+            registered_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+    )
+    ddl.append(
+        """
+        CREATE TABLE IF NOT EXISTS tasks(
+            task_id SERIAL PRIMARY KEY,
+            admin_id BIGINT,
+            user_id BIGINT REFERENCES users(user_id) ON DELETE CASCADE,
+            task_text TEXT,
+            is_done BOOLEAN DEFAULT FALSE,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+    )
+    # Add new columns idempotently BEFORE creating indexes that depend on them
+    ddl.append("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS is_daily BOOLEAN DEFAULT TRUE;")
+    ddl.append("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS last_reset DATE DEFAULT CURRENT_DATE;")
+    ddl.append("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP NULL;")
+
+    # Settings table for per-user preferences
+    ddl.append(
+        """
+        CREATE TABLE IF NOT EXISTS user_settings(
+            user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+            mute_reminders BOOLEAN DEFAULT FALSE,
+            work_start SMALLINT DEFAULT 9,   -- inclusive, 0..23
+            work_end SMALLINT DEFAULT 21     -- exclusive, 1..24 (24 means 24/7 with start=0)
+        );
+        """
+    )
+
+    # Dynamic admins table (separate from ENV)
+    ddl.append(
+        """
+        CREATE TABLE IF NOT EXISTS admins(
+            user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+            added_by BIGINT,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+    )
+
+    # Per-user task/done counters, kept current by triggers on tasks so the
+    # admin user list reads them straight off users instead of aggregating.
+    ddl.append("ALTER TABLE users ADD COLUMN IF NOT EXISTS task_count INTEGER NOT NULL DEFAULT 0;")
+    ddl.append("ALTER TABLE users ADD COLUMN IF NOT EXISTS done_count INTEGER NOT NULL DEFAULT 0;")
+    ddl.append(
+        """
+        CREATE OR REPLACE FUNCTION tasks_sync_user_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE users
+                SET task_count = task_count - 1,
+                    done_count = done_count - (OLD.is_done IS TRUE)::int
+                WHERE user_id = OLD.user_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                UPDATE users
+                SET task_count = task_count + 1,
+                    done_count = done_count + (NEW.is_done IS TRUE)::int
+                WHERE user_id = NEW.user_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    ddl.append("DROP TRIGGER IF EXISTS tasks_user_counts_ins ON tasks;")
+    ddl.append("DROP TRIGGER IF EXISTS tasks_user_counts_del ON tasks;")
+    ddl.append("DROP TRIGGER IF EXISTS tasks_user_counts_upd ON tasks;")
+    ddl.append(
+        "CREATE TRIGGER tasks_user_counts_ins AFTER INSERT ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_sync_user_counts();"
+    )
+    ddl.append(
+        "CREATE TRIGGER tasks_user_counts_del AFTER DELETE ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_sync_user_counts();"
+    )
+    ddl.append(
+        """
+        CREATE TRIGGER tasks_user_counts_upd AFTER UPDATE OF is_done, user_id ON tasks
+        FOR EACH ROW
+        WHEN (OLD.is_done IS DISTINCT FROM NEW.is_done OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+        EXECUTE FUNCTION tasks_sync_user_counts();
+        """
+    )
+    # Backfill/repair counters (only rows that drifted are rewritten)
+    ddl.append(
+        """
+        UPDATE users u
+        SET task_count = s.task_count,
+            done_count = s.done_count
+        FROM (
+            SELECT uu.user_id,
+                   COUNT(t.task_id) AS task_count,
+                   COUNT(t.task_id) FILTER (WHERE t.is_done) AS done_count
+            FROM users uu
+            LEFT JOIN tasks t ON t.user_id = uu.user_id
+            GROUP BY uu.user_id
+        ) s
+        WHERE s.user_id = u.user_id
+          AND (u.task_count, u.done_count) IS DISTINCT FROM (s.task_count, s.done_count);
+        """
+    )
+
+    # Indexes
+    # (user_id, task_id DESC) serves the per-user list and its keyset pages
+    # without a sort, and covers plain user_id lookups.
+    ddl.append("CREATE INDEX IF NOT EXISTS idx_tasks_user_task ON tasks(user_id, task_id DESC);")
+    ddl.append("DROP INDEX IF EXISTS idx_tasks_user;")
+    ddl.append("DROP INDEX IF EXISTS idx_tasks_user_created;")
+    # Pending-only, ordered by task_id: reminder samples and the user-detail preview
+    ddl.append("DROP INDEX IF EXISTS idx_tasks_pending;")
+    ddl.append("CREATE INDEX IF NOT EXISTS idx_tasks_user_pending ON tasks(user_id, task_id) WHERE NOT is_done;")
+    ddl.append("CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed_at);")
+    # Daily tasks only: serves the midnight report and the daily reset
+    ddl.append("CREATE INDEX IF NOT EXISTS idx_tasks_daily ON tasks(user_id, completed_at) WHERE is_daily;")
+    ddl.append("CREATE INDEX IF NOT EXISTS idx_users_task_count ON users(task_count DESC, user_id);")
 
-        # Indexes
-        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks(user_id);")
-        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_pending ON tasks(user_id, is_done);")
-        c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed_at);")
+    with _get_conn() as conn, conn.cursor() as c:
+        c.execute("\n".join(ddl))
 
 def _ensure_user_and_settings_sync(user_id: int, username: Optional[str], first_name: Optional[str], last_name: Optional[str]):
+    profile = (username, first_name, last_name)
+    if _SEEN_USERS.get(user_id) == profile:
+        return  # already registered with this exact profile
     with _get_conn() as conn, conn.cursor() as c:
-        c.execute(
-            """
-            INSERT INTO users (user_id, username, first_name, last_name)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (user_id) DO UPDATE SET
-                username = EXCLUDED.username,
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name
-            """,
-            (user_id, username, first_name, last_name),
-        )
-        c.execute("INSERT INTO user_settings (user_id) VALUES (%s) ON CONFLICT (user_id) DO NOTHING", (user_id,))
+        _execute_prepared(c, "ensure_user", (user_id, username, first_name, last_name))
+    _SEEN_USERS.put(user_id, profile)
 
 def _add_task_sync(admin_id: int, user_id: int, task_text: str):
     with _get_conn() as conn, conn.cursor() as c:
-        c.execute("INSERT INTO tasks (admin_id, user_id, task_text) VALUES (%s, %s, %s)", (admin_id, user_id, task_text))
+        _execute_prepared(c, "add_task", (admin_id, user_id, task_text))
+    _TASKS_CACHE.pop(user_id)
 
-def _toggle_task_sync(task_id: int, user_id: int):
-    """Toggle task status and set/clear completed_at accordingly."""
+def _add_tasks_bulk_sync(admin_id: int, rows: List[Tuple[int, str]]):
+    """Insert [(user_id, task_text), ...] in a single round-trip."""
+    if not rows:
+        return
     with _get_conn() as conn, conn.cursor() as c:
-        c.execute("SELECT is_done FROM tasks WHERE task_id=%s AND user_id=%s", (task_id, user_id))
-        row = c.fetchone()
-        if not row:
-            return
-        current = row[0]
-        if current:
-            c.execute("UPDATE tasks SET is_done = FALSE, completed_at = NULL WHERE task_id=%s AND user_id=%s", (task_id, user_id))
-        else:
-            # Store in UTC so we can reliably convert to local when reporting
-            c.execute("UPDATE tasks SET is_done = TRUE, completed_at = NOW() AT TIME ZONE 'UTC' WHERE task_id=%s AND user_id=%s", (task_id, user_id))
+        execute_values(
+            c,
+            "INSERT INTO tasks (admin_id, user_id, task_text) VALUES %s",
+            [(admin_id, user_id, task_text) for user_id, task_text in rows],
+            page_size=500,
+        )
+    for user_id in {user_id for user_id, _ in rows}:
+        _TASKS_CACHE.pop(user_id)
 
-def _delete_task_sync(task_id: int):
+def _toggle_task(c, task_id: int, user_id: int):
+    """Toggle task status and set/clear completed_at accordingly."""
+    _execute_prepared(c, "toggle_task", (task_id, user_id))
+
+def _toggle_task_and_page_sync(task_id: int, user_id: int, cursor: int):
+    """Toggle a task and return the owner's refreshed task page in one checkout."""
+    # Separate statements in one transaction: a data-modifying CTE would not let
+    # the outer SELECT see the new is_done value (same snapshot).
     with _get_conn() as conn, conn.cursor() as c:
-        c.execute("DELETE FROM tasks WHERE task_id = %s", (task_id,))
+        _toggle_task(c, task_id, user_id)
+        task_page = _fetch_task_page(c, user_id, cursor)
+    _TASKS_CACHE.pop(user_id)
+    return task_page
 
-def _get_user_tasks_sync(user_id: int) -> List[Tuple[int, str, bool, datetime]]:
+def _get_user_pending_sync(user_id: int) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Return (pending_count, newest PENDING_PREVIEW_LIMIT pending (task_id, task_text) rows).
+    Cached for TASKS_CACHE_TTL seconds; every task write invalidates its owner.
+    """
+    hit = _TASKS_CACHE.get(user_id)
+    if hit is None:
+        # Taken before the read: if a write pops this user meanwhile, the
+        # (possibly pre-write) result is returned but not cached
+        token = _TASKS_CACHE.generation(user_id)
+        with _get_conn(readonly=True) as conn, conn.cursor() as c:
+            _execute_prepared(c, "user_pending_preview", (user_id, PENDING_PREVIEW_LIMIT))
+            row = c.fetchone()
+        hit = (row[0], [tuple(t) for t in row[1]]) if row else (0, [])
+        _TASKS_CACHE.put_if_unchanged(user_id, hit, token)
+    return hit
+
+def _start_sync(user_id: int, username: Optional[str], first_name: Optional[str], last_name: Optional[str]) -> int:
+    """Register the user (if their profile changed) and return their pending count in one round-trip."""
+    profile = (username, first_name, last_name)
+    if _SEEN_USERS.get(user_id) == profile:
+        # Known profile: a pure read, so skip BEGIN/COMMIT
+        with _get_conn(readonly=True) as conn, conn.cursor() as c:
+            _execute_prepared(c, "user_counts", (user_id,))
+            row = c.fetchone()
+        return (row[0] - row[1]) if row else 0
     with _get_conn() as conn, conn.cursor() as c:
+        _execute_prepared(c, "ensure_user", (user_id, username, first_name, last_name))
+        pending = c.fetchone()[0]
+    _SEEN_USERS.put(user_id, profile)
+    return pending
+
+def _fetch_task_page(c, user_id: int, cursor: int):
+    """
+    Return (rows, done, pending, prev_cursor, next_cursor) for the page that
+    starts at task `cursor` (0 = newest). Missing neighbours are None.
+    """
+    _execute_prepared(c, "user_counts", (user_id,))
+    row = c.fetchone()
+    total, done = row if row else (0, 0)
+    # One extra row tells us where the next page starts
+    if cursor:
+        _execute_prepared(c, "task_page_from", (user_id, cursor, TASKS_PER_PAGE + 1))
+    else:
+        _execute_prepared(c, "task_page_first", (user_id, TASKS_PER_PAGE + 1))
+    rows = c.fetchall()
+    next_cursor = rows.pop()[0] if len(rows) > TASKS_PER_PAGE else None
+    prev_cursor = None
+    if cursor:
+        _execute_prepared(c, "task_page_prev", (user_id, cursor, TASKS_PER_PAGE))
+        prev_cursor = c.fetchone()[0]
+    return rows, done, total - done, prev_cursor, next_cursor
+
+def _get_task_page_sync(user_id: int, cursor: int = 0):
+    with _get_conn(readonly=True) as conn, conn.cursor() as c:
+        return _fetch_task_page(c, user_id, cursor)
+
+# Display labels are resolved in SQL so the menu only escapes and formats
+_USER_COLS = """
+    user_id,
+    COALESCE(NULLIF(first_name, ''), user_id::text) AS name,
+    COALESCE('@' || NULLIF(username, ''), 'no-username') AS uname,
+    task_count,
+    done_count
+"""
+
+def _get_users_page_sync(cursor: Optional[Tuple[int, int]], limit: int):
+    """
+    Keyset page of users ordered by (task_count DESC, user_id ASC), starting at
+    the (task_count, user_id) `cursor` (None = first page).
+    Return (rows, prev_cursor, next_cursor); missing neighbours are None.
+    """
+    with _get_conn(readonly=True) as conn, conn.cursor() as c:
+        if cursor is None:
+            c.execute(
+                f"SELECT {_USER_COLS} FROM users ORDER BY task_count DESC, user_id ASC LIMIT %s",
+                (limit + 1,),
+            )
+        else:
+            # task_count <= %s is the index-usable bound; the OR orders ties by user_id
+            c.execute(
+                f"""
+                SELECT {_USER_COLS} FROM users
+                WHERE task_count <= %s AND (task_count < %s OR user_id >= %s)
+                ORDER BY task_count DESC, user_id ASC
+                LIMIT %s
+                """,
+                (cursor[0], cursor[0], cursor[1], limit + 1),
+            )
+        rows = c.fetchall()
+        next_cursor = (rows[limit][3], rows[limit][0]) if len(rows) > limit else None
+        rows = rows[:limit]
+
+        prev_cursor = None
+        if cursor is not None and rows:
+            # Walk back up to `limit` users; the farthest one starts the previous page
+            c.execute(
+                """
+                SELECT task_count, user_id FROM users
+                WHERE task_count >= %s AND (task_count > %s OR user_id < %s)
+                ORDER BY task_count ASC, user_id DESC
+                LIMIT %s
+                """,
+                (rows[0][3], rows[0][3], rows[0][0], limit),
+            )
+            before = c.fetchall()
+            if before:
+                prev_cursor = tuple(before[-1])
+    return rows, prev_cursor, next_cursor
+
+def _get_stats_sync(top_n: int = 5):
+    """
+    Return (users_cnt, tasks_cnt, done_cnt, [(display_name, done_pct), ...top_n])
+    in one statement over the users counters. Cached for STATS_CACHE_TTL seconds.
+    """
+    key = ("stats", top_n)
+    stats = _STATS_CACHE.get(key)
+    if stats is None:
+        with _get_conn(readonly=True) as conn, conn.cursor() as c:
+            c.execute(
+                """
+                WITH top AS (
+                    SELECT user_id,
+                           COALESCE(first_name, user_id::text) AS name,
+                           ROUND(done_count * 100.0 / task_count, 1)::float8 AS pct
+                    FROM users
+                    WHERE task_count > 0
+                    ORDER BY pct DESC, user_id ASC
+                    LIMIT %s
+                )
+                SELECT COUNT(*),
+                       COALESCE(SUM(task_count), 0),
+                       COALESCE(SUM(done_count), 0),
+                       (SELECT COALESCE(json_agg(json_build_array(name, pct) ORDER BY pct DESC, user_id), '[]')
+                        FROM top)
+                FROM users
+                """,
+                (top_n,),
+            )
+            users_cnt, tasks_cnt, done_cnt, top = c.fetchone()
+        stats = (users_cnt, int(tasks_cnt), int(done_cnt), [tuple(t) for t in top])
+        _STATS_CACHE.put(key, stats)
+    return stats
+
+def _get_pending_grouped_sync(local_hour: int, limit_per_user: int = 5) -> List[Tuple[int, int, List[str]]]:
+    """
+    Return [(user_id, pending_count, sample_texts<=limit_per_user), ...] for users
+    with pending tasks, reminders not muted and `local_hour` inside their working hours.
+    """
+    # Counts come from the users counters; samples are the oldest pending tasks,
+    # read per user off idx_tasks_user_pending so only `limit_per_user` texts travel.
+    # Working hours are [start, end) in local time, wrapping past midnight when
+    # start > end; 0–24 means 24/7. Users outside their window are never fetched.
+    with _get_conn(readonly=True) as conn, conn.cursor() as c:
         c.execute(
             """
-            SELECT task_id, task_text, is_done, created_date
-            FROM tasks
-            WHERE user_id = %s
-            ORDER BY created_date DESC
+            SELECT u.user_id,
+                   u.task_count - u.done_count AS pending,
+                   ARRAY(
+                       SELECT t.task_text
+                       FROM tasks t
+                       WHERE t.user_id = u.user_id AND NOT t.is_done
+                       ORDER BY t.task_id ASC
+                       LIMIT %(limit)s
+                   ) AS samples
+            FROM users u
+            LEFT JOIN user_settings s ON s.user_id = u.user_id
+            CROSS JOIN LATERAL (
+                SELECT LEAST(24, GREATEST(0, COALESCE(s.work_start, 9))) AS ws,
+                       LEAST(24, GREATEST(0, COALESCE(s.work_end, 21))) AS we
+            ) w
+            WHERE u.task_count > u.done_count
+              AND NOT COALESCE(s.mute_reminders, FALSE)
+              AND (
+                    (w.ws = 0 AND w.we = 24)
+                 OR (w.ws < w.we AND %(hour)s >= w.ws AND %(hour)s < w.we)
+                 OR (w.ws > w.we AND (%(hour)s >= w.ws OR %(hour)s < w.we))
+              )
+            ORDER BY u.user_id ASC
             """,
-            (user_id,),
+            {"limit": limit_per_user, "hour": local_hour},
         )
         return c.fetchall()
 
-def _get_all_users_sync(offset: int = 0, limit: int = 10) -> List[Tuple[int, Optional[str], Optional[str], int, int]]:
+def _get_user_settings_sync(user_id: int) -> Tuple[bool, int, int]:
+    """Fetch user's settings, ensure defaults exist. Cached; updates write through."""
+    settings = _SETTINGS_CACHE.get(user_id)
+    if settings is not None:
+        return settings
     with _get_conn() as conn, conn.cursor() as c:
+        # Usually one round-trip: the CTE returns a freshly inserted default row;
+        # otherwise the plain SELECT (same snapshot, so never both) returns the
+        # existing one.
         c.execute(
             """
-            SELECT u.user_id, u.first_name, u.username,
-                   COUNT(t.task_id) AS task_count,
-                   COALESCE(SUM(CASE WHEN t.is_done THEN 1 ELSE 0 END), 0) AS done_count
-            FROM users u
-            LEFT JOIN tasks t ON u.user_id = t.user_id
-            GROUP BY u.user_id, u.first_name, u.username
-            ORDER BY task_count DESC, u.user_id ASC
-            OFFSET %s LIMIT %s
+            WITH ins AS (
+                INSERT INTO user_settings (user_id) VALUES (%s)
+                ON CONFLICT DO NOTHING
+                RETURNING mute_reminders, work_start, work_end
+            )
+            SELECT mute_reminders, work_start, work_end FROM ins
+            UNION ALL
+            SELECT mute_reminders, work_start, work_end FROM user_settings WHERE user_id = %s
             """,
-            (offset, limit),
+            (user_id, user_id),
         )
-        return c.fetchall()
-
-def _get_users_count_sync() -> int:
-    with _get_conn() as conn, conn.cursor() as c:
-        c.execute("SELECT COUNT(*) FROM users")
-        return c.fetchone()[0]
-
-def _get_global_stats_sync():
+        row = c.fetchone()
+        if row is None:
+            # A concurrent insert committed after our snapshot: the conflict
+            # suppressed ours, yet the row was invisible to the SELECT. A new
+            # statement takes a fresh snapshot and sees it.
+            c.execute(
+                "SELECT mute_reminders, work_start, work_end FROM user_settings WHERE user_id = %s",
+                (user_id,),
+            )
+            row = c.fetchone()
+    settings = (bool(row[0]), int(row[1]), int(row[2]))
+    _SETTINGS_CACHE.put(user_id, settings)
+    return settings
+
+def _update_user_settings_sync(user_id: int, mute: Optional[bool] = None, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[bool, int, int]:
+    """Update settings selectively (None = keep); return (and cache) the resulting settings."""
+    start = _clamp_hour(start) if start is not None else None
+    end = _clamp_hour(end) if end is not None else None
     with _get_conn() as conn, conn.cursor() as c:
+        # One upsert: new rows take the given values or the column defaults,
+        # existing rows keep any column passed as NULL.
         c.execute(
             """
-            SELECT
-                (SELECT COUNT(*) FROM users) AS users_cnt,
-                (SELECT COUNT(*) FROM tasks) AS tasks_cnt,
-                (SELECT COALESCE(SUM(CASE WHEN is_done THEN 1 ELSE 0 END), 0) FROM tasks) AS done_cnt
-            """
+            INSERT INTO user_settings AS s (user_id, mute_reminders, work_start, work_end)
+            VALUES (%s, COALESCE(%s, FALSE), COALESCE(%s, 9), COALESCE(%s, 21))
+            ON CONFLICT (user_id) DO UPDATE SET
+                mute_reminders = COALESCE(%s, s.mute_reminders),
+                work_start = COALESCE(%s, s.work_start),
+                work_end = COALESCE(%s, s.work_end)
+            RETURNING mute_reminders, work_start, work_end
+            """,
+            (user_id, mute, start, end, mute, start, end),
         )
-        users_cnt, tasks_cnt, done_cnt = c.fetchone()
-        return users_cnt, tasks_cnt, done_cnt
+        row = c.fetchone()
+    settings = (bool(row[0]), int(row[1]), int(row[2]))
+    _SETTINGS_CACHE.put(user_id, settings)
+    return settings
 
-def _get_pending_grouped_sync(limit_per_user: int = 5) -> List[Tuple[int, int, List[str]]]:
-    """Return [(user_id, pending_count, sample_texts<=limit_per_user), ...]"""
+_HOUR_SETTINGS = frozenset({"work_start", "work_end"})
+
+def _bump_hour_setting_sync(user_id: int, field: str, delta: int) -> Tuple[bool, int, int]:
+    """Shift work_start/work_end by `delta` hours (clamped to 0..24) in one statement."""
+    if field not in _HOUR_SETTINGS:
+        raise ValueError(f"not an hour setting: {field}")
     with _get_conn() as conn, conn.cursor() as c:
         c.execute(
-            """
-            SELECT user_id, task_text
-            FROM tasks
-            WHERE is_done = FALSE
-            ORDER BY created_date ASC
-            """
+            f"""
+            INSERT INTO user_settings (user_id) VALUES (%s)
+            ON CONFLICT (user_id) DO UPDATE
+                SET {field} = LEAST(24, GREATEST(0, user_settings.{field} + %s))
+            RETURNING mute_reminders, work_start, work_end
+            """,
+            (user_id, delta),
         )
-        rows = c.fetchall()
-    grouped: Dict[int, Tuple[int, List[str]]] = {}
-    for user_id, task_text in rows:
-        if user_id not in grouped:
-            grouped[user_id] = (0, [])
-        cnt, samples = grouped[user_id]
-        cnt += 1
-        if len(samples) < limit_per_user:
-            samples.append(task_text)
-        grouped[user_id] = (cnt, samples)
-    return [(uid, data[0], data[1]) for uid, data in grouped.items()]
-
-def _get_all_settings_map_sync() -> Dict[int, Tuple[bool, int, int]]:
-    """Return {user_id: (mute_reminders, work_start, work_end)}."""
+        row = c.fetchone()
+    settings = (bool(row[0]), int(row[1]), int(row[2]))
+    _SETTINGS_CACHE.put(user_id, settings)
+    return settings
+
+def _toggle_mute_sync(user_id: int) -> Tuple[bool, int, int]:
     with _get_conn() as conn, conn.cursor() as c:
         c.execute(
             """
-            SELECT u.user_id,
-                   COALESCE(s.mute_reminders, FALSE) AS mute_reminders,
-                   COALESCE(s.work_start, 9) AS work_start,
-                   COALESCE(s.work_end, 21) AS work_end
-            FROM users u
-            LEFT JOIN user_settings s ON s.user_id = u.user_id
-            """
+            INSERT INTO user_settings (user_id) VALUES (%s)
+            ON CONFLICT (user_id) DO UPDATE
+                SET mute_reminders = NOT user_settings.mute_reminders
+            RETURNING mute_reminders, work_start, work_end
+            """,
+            (user_id,),
         )
-        rows = c.fetchall()
-    return {r[0]: (bool(r[1]), int(r[2]), int(r[3])) for r in rows}
-
-def _get_user_settings_sync(user_id: int) -> Tuple[bool, int, int]:
-    """Fetch user's settings, ensure defaults exist."""
-    with _get_conn() as conn, conn.cursor() as c:
-        c.execute("INSERT INTO user_settings (user_id) VALUES (%s) ON CONFLICT DO NOTHING", (user_id,))
-        c.execute("SELECT mute_reminders, work_start, work_end FROM user_settings WHERE user_id=%s", (user_id,))
         row = c.fetchone()
-    if not row:
-        return (False, 9, 21)
-    return (bool(row[0]), int(row[1]), int(row[2]))
-
-def _update_user_settings_sync(user_id: int, mute: Optional[bool] = None, start: Optional[int] = None, end: Optional[int] = None):
-    """Update settings selectively."""
-    with _get_conn() as conn, conn.cursor() as c:
-        c.execute("INSERT INTO user_settings (user_id) VALUES (%s) ON CONFLICT DO NOTHING", (user_id,))
-        sets = []
-        vals: List[object] = []
-        if mute is not None:
-            sets.append("mute_reminders=%s")
-            vals.append(mute)
-        if start is not None:
-            sets.append("work_start=%s")
-            vals.append(_clamp_hour(start))
-        if end is not None:
-            sets.append("work_end=%s")
-            vals.append(_clamp_hour(end))
-        if not sets:
-            return
-        q = f"UPDATE user_settings SET {', '.join(sets)} WHERE user_id=%s"
-        vals.append(user_id)
-        c.execute(q, tuple(vals))
+    settings = (bool(row[0]), int(row[1]), int(row[2]))
+    _SETTINGS_CACHE.put(user_id, settings)
+    return settings
 
 # ---------- Dynamic admins (DB) ----------
 def _is_admin_db_sync(user_id: int) -> bool:
-    with _get_conn() as conn, conn.cursor() as c:
-        c.execute("SELECT 1 FROM admins WHERE user_id=%s", (user_id,))
-        return c.fetchone() is not None
+    """Cached for ADMIN_CACHE_TTL seconds; grant/revoke below invalidate."""
+    is_admin = _ADMIN_CACHE.get(user_id)
+    if is_admin is None:
+        with _get_conn(readonly=True) as conn, conn.cursor() as c:
+            _execute_prepared(c, "is_admin_db", (user_id,))
+            is_admin = c.fetchone() is not None
+        _ADMIN_CACHE.put(user_id, is_admin)
+    return is_admin
 
 def _add_admin_sync(target_user_id: int, added_by: int):
     with _get_conn() as conn, conn.cursor() as c:
@@ -348,14 +909,16 @@ def _add_admin_sync(target_user_id: int, added_by: int):
             "INSERT INTO admins (user_id, added_by) VALUES (%s, %s) ON CONFLICT (user_id) DO NOTHING",
             (target_user_id, added_by),
         )
+    _ADMIN_CACHE.pop(target_user_id)
 
 def _remove_admin_sync(target_user_id: int):
     with _get_conn() as conn, conn.cursor() as c:
         c.execute("DELETE FROM admins WHERE user_id=%s", (target_user_id,))
+    _ADMIN_CACHE.pop(target_user_id)
 
 def _get_admins_db_detailed_sync() -> List[Tuple[int, Optional[str], Optional[str], Optional[int], Optional[datetime]]]:
     """Return DB admins joined with user profile info."""
-    with _get_conn() as conn, conn.cursor() as c:
+    with _get_conn(readonly=True) as conn, conn.cursor() as c:
         c.execute(
             """
             SELECT a.user_id, u.first_name, u.username, a.added_by, a.added_at
@@ -369,20 +932,37 @@ def _get_admins_db_detailed_sync() -> List[Tuple[int, Optional[str], Optional[st
 def _get_users_info_sync(user_ids: List[int]) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
     if not user_ids:
         return {}
-    with _get_conn() as conn, conn.cursor() as c:
+    with _get_conn(readonly=True) as conn, conn.cursor() as c:
         q = "SELECT user_id, first_name, username FROM users WHERE user_id = ANY(%s)"
         c.execute(q, (user_ids,))
         rows = c.fetchall()
     return {r[0]: (r[1], r[2]) for r in rows}
 
 async def run_db(func, *args):
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(EXECUTOR, func, *args)
+    return await asyncio.get_running_loop().run_in_executor(EXECUTOR, func, *args)
+
+# In-flight idempotent reads, keyed by (func, args)
+_INFLIGHT: Dict[tuple, asyncio.Future] = {}
+
+async def run_db_shared(func, *args):
+    """run_db for idempotent reads: concurrent identical calls share one execution."""
+    key = (func, args)
+    fut = _INFLIGHT.get(key)
+    if fut is None:
+        fut = asyncio.ensure_future(run_db(func, *args))
+        _INFLIGHT[key] = fut
+        fut.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # Shield so one caller being cancelled doesn't cancel the others' result
+    return await asyncio.shield(fut)
 
 # ---------- Admin check (ENV + DB) ----------
 async def is_admin_async(user_id: int, username: Optional[str]) -> bool:
     if is_admin_env(user_id, username):
         return True
+    # Cache hit: skip the executor hop entirely
+    cached = _ADMIN_CACHE.get(user_id)
+    if cached is not None:
+        return cached
     return await run_db(_is_admin_db_sync, user_id)
 
 # =============================
@@ -390,51 +970,45 @@ async def is_admin_async(user_id: int, username: Optional[str]) -> bool:
 # =============================
 def _collect_yesterday_report_and_reset_sync(tz_name: str):
     """
-    Return per-user tuples (user_id, total_daily, completed_yesterday),
+    Return (per-user tuples (user_id, total_daily, completed_yesterday), total_users),
     then reset daily tasks (is_daily=TRUE) once per local day.
     We store completed_at in UTC; convert to local date for "yesterday".
     """
-    with _get_conn() as conn, conn.cursor() as c:
-        # Local "today" date in the specified timezone
-        c.execute("SELECT (now() AT TIME ZONE %s)::date", (tz_name,))
-        today_local = c.fetchone()[0]
-        yesterday_local = today_local - timedelta(days=1)
+    # Local "today" and yesterday's [00:00, 24:00) window as naive UTC, so the
+    # completed_at comparison is a plain range test
+    tz = ZoneInfo(tz_name)
+    today_local = datetime.now(tz=tz).date()
+    yesterday_local = today_local - timedelta(days=1)
+    window = [
+        datetime.combine(d, time(0, 0), tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+        for d in (yesterday_local, today_local)
+    ]
 
-        # Aggregate totals and completed-yesterday per user
+    with _get_conn() as conn, conn.cursor() as c:
+        # Full scan + bulk reset (plus counter triggers) can outlast the
+        # interactive statement_timeout; a timeout here would skip the whole day
+        c.execute("SET LOCAL statement_timeout = 0;")
+        # Totals and completed-yesterday per user in one pass over daily tasks
         c.execute(
             """
-            WITH daily AS (
-                SELECT user_id
-                FROM tasks
-                WHERE is_daily = TRUE
-                GROUP BY user_id
-            ),
-            totals AS (
-                SELECT user_id, COUNT(*) AS total_daily
-                FROM tasks
-                WHERE is_daily = TRUE
-                GROUP BY user_id
-            ),
-            done_y AS (
-                SELECT t.user_id, COUNT(*) AS completed_yesterday
-                FROM tasks t
-                WHERE t.is_daily = TRUE
-                  AND t.is_done = TRUE
-                  AND ((t.completed_at AT TIME ZONE 'UTC') AT TIME ZONE %s)::date = %s
-                GROUP BY t.user_id
-            )
-            SELECT d.user_id,
-                   COALESCE(tt.total_daily, 0) AS total_daily,
-                   COALESCE(dy.completed_yesterday, 0) AS completed_yesterday
-            FROM daily d
-            LEFT JOIN totals tt ON tt.user_id = d.user_id
-            LEFT JOIN done_y dy ON dy.user_id = d.user_id
-            ORDER BY d.user_id ASC
+            SELECT user_id,
+                   COUNT(*) AS total_daily,
+                   COUNT(*) FILTER (
+                       WHERE is_done AND completed_at >= %s AND completed_at < %s
+                   ) AS completed_yesterday
+            FROM tasks
+            WHERE is_daily
+            GROUP BY user_id
+            ORDER BY user_id ASC
             """,
-            (tz_name, yesterday_local),
+            (window[0], window[1]),
         )
         rows = c.fetchall()
 
+        # For the admin summary, on the same checkout
+        c.execute("SELECT COUNT(*) FROM users")
+        total_users = c.fetchone()[0]
+
         # Reset daily tasks once per local day based on last_reset
         c.execute(
             """
@@ -447,39 +1021,72 @@ def _collect_yesterday_report_and_reset_sync(tz_name: str):
             """,
             (today_local, today_local),
         )
-
-        return rows
+    _TASKS_CACHE.clear()
+    return rows, total_users
 
 # =============================
 # UI / Menus (HTML)
 # =============================
+# Static texts, built once at import
+ADMIN_MENU_TEXT = "<b>👑 Admin Panel — Main Menu</b>\n\nWhat do you want to do?"
+USER_ROW_DIVIDER = "   ─────────────────"
+# Attached to every reminder; immutable, so one instance serves the whole broadcast
+REMINDER_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Open My Tasks", callback_data="my_tasks")],
+    [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
+])
+ADMIN_MAIN_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👥 Manage Users", callback_data="admin_users:0")],
+    [InlineKeyboardButton("📊 Global Stats", callback_data="admin_stats")],
+    [InlineKeyboardButton("🔧 Admins", callback_data="admins_menu")],
+    [InlineKeyboardButton("✅ My Tasks", callback_data="my_tasks")],
+    [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
+    [InlineKeyboardButton("ℹ️ Help", callback_data="help")],
+])
+USER_MAIN_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ My Tasks", callback_data="my_tasks")],
+    [InlineKeyboardButton("➕ New Task", callback_data="add_self_task")],
+    [InlineKeyboardButton("📊 My Status", callback_data="my_stats")],
+    [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
+    [InlineKeyboardButton("ℹ️ Help", callback_data="help")],
+])
+BACK_TO_MENU_KEYBOARD = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="main_menu")]])
+HELP_TEXT = (
+    "ℹ️ <b>Task Manager Bot — Help</b>\n\n"
+    "🎯 <b>Users:</b>\n"
+    "• ✅ My Tasks — view & toggle tasks\n"
+    "• ➕ New Task — add a task for yourself\n"
+    "• 📊 My Status — quick stats\n"
+    "• ⚙️ Settings — mute reminders & working hours\n\n"
+    "👑 <b>Admins:</b>\n"
+    "• 👥 Manage Users — browse users, add tasks\n"
+    "• 🔧 Admins — view/add/remove DB admins\n"
+    "• 📊 Global Stats — overall metrics\n\n"
+    "⌨️ <b>Commands:</b>\n"
+    "/start — main menu\n"
+    "/mytasks — my tasks\n"
+    "/add — add a new task for yourself\n"
+    "/users — user management (admins)\n"
+    "/admins — admins overview (admins)\n"
+    "/settings — user settings\n"
+    "/whoami — show your Telegram info\n"
+    "/amadmin — check admin recognition\n"
+)
+
 async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, message=None):
     user = update.effective_user
-    await run_db(_ensure_user_and_settings_sync, user.id, user.username, user.first_name, user.last_name)
 
     if await is_admin_async(user.id, user.username):
-        keyboard = [
-            [InlineKeyboardButton("👥 Manage Users", callback_data="admin_users:0")],
-            [InlineKeyboardButton("📊 Global Stats", callback_data="admin_stats")],
-            [InlineKeyboardButton("🔧 Admins", callback_data="admins_menu")],
-            [InlineKeyboardButton("✅ My Tasks", callback_data="my_tasks")],
-            [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
-            [InlineKeyboardButton("ℹ️ Help", callback_data="help")],
-        ]
-        text = "<b>👑 Admin Panel — Main Menu</b>\n\nWhat do you want to do?"
+        # Known profile: skip the executor hop entirely
+        if _SEEN_USERS.get(user.id) != (user.username, user.first_name, user.last_name):
+            await run_db(_ensure_user_and_settings_sync, user.id, user.username, user.first_name, user.last_name)
+        text, keyboard = ADMIN_MENU_TEXT, ADMIN_MAIN_KEYBOARD
     else:
-        tasks = await run_db(_get_user_tasks_sync, user.id)
-        pending = sum(1 for t in tasks if not t[2])
-        keyboard = [
-            [InlineKeyboardButton("✅ My Tasks", callback_data="my_tasks")],
-            [InlineKeyboardButton("➕ New Task", callback_data="add_self_task")],
-            [InlineKeyboardButton("📊 My Status", callback_data="my_stats")],
-            [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
-            [InlineKeyboardButton("ℹ️ Help", callback_data="help")],
-        ]
+        pending = await run_db(_start_sync, user.id, user.username, user.first_name, user.last_name)
+        keyboard = USER_MAIN_KEYBOARD
         text = f"👋 <b>Hello {esc(user.first_name)}</b>\n\n📊 You have <b>{pending}</b> pending task(s)."
 
-    await safe_edit_or_send(update, text, InlineKeyboardMarkup(keyboard), message)
+    await safe_edit_or_send(update, text, keyboard, message)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await show_main_menu(update, context)
@@ -491,7 +1098,7 @@ async def add_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Let user add a task for themselves via /add."""
     context.user_data["adding_self_task"] = True
     await update.message.reply_text(
-        "✏️ Send me the task text to add it to your list.",
+        "✏️ Send me the task text to add it to your list (one task per line).",
         parse_mode=ParseMode.HTML,
         disable_web_page_preview=True,
     )
@@ -501,7 +1108,7 @@ async def users_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not await is_admin_async(user.id, user.username):
         await update.message.reply_text("❌ Access denied.")
         return
-    await show_admin_users_menu(update, page=0)
+    await show_admin_users_menu(update)
 
 async def whoami_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     u = update.effective_user
@@ -532,9 +1139,21 @@ async def amadmin_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def settings_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await show_settings_menu(update)
 
-async def show_user_tasks_menu(update: Update, user_id: int, message=None):
-    """Render user's task list with toggle and delete per item."""
-    tasks = await run_db(_get_user_tasks_sync, user_id)
+async def show_user_tasks_menu(update: Update, user_id: int, message=None, cursor: int = 0, task_page=None):
+    """Render the page of a user's tasks starting at `cursor`, with toggle and delete per item.
+
+    Pass `task_page` (as returned by _get_task_page_sync) to skip the fetch; after
+    a write, always pass the page read in the write's own transaction, since the
+    shared fetch may join a read that started before the write.
+    """
+    if task_page is None:
+        task_page = await run_db_shared(_get_task_page_sync, user_id, cursor)
+    tasks, done, pending, prev_cursor, next_cursor = task_page
+    if not tasks and cursor:
+        # The page emptied (e.g. after a delete): step back one page. Plain run_db:
+        # this may follow a write, and must not join a read that started before it.
+        cursor = prev_cursor or 0
+        tasks, done, pending, prev_cursor, next_cursor = await run_db(_get_task_page_sync, user_id, cursor)
     if not tasks:
         keyboard = []
         if update.effective_user.id == user_id:
@@ -543,20 +1162,18 @@ async def show_user_tasks_menu(update: Update, user_id: int, message=None):
         await safe_edit_or_send(update, "🎉 <b>No tasks!</b>\n\nYou’re all caught up.", InlineKeyboardMarkup(keyboard), message)
         return
 
-    pending = sum(1 for t in tasks if not t[2])
-    done = sum(1 for t in tasks if t[2])
-
     lines = [f"📋 <b>Your Tasks</b>\n", f"📊 Status: ✅ {done} done | ⏳ {pending} pending\n"]
     keyboard = []
 
-    for task_id, task_text, is_done, created_date in tasks[:40]:
+    for task_id, task_text, is_done, created_date in tasks:
         emoji = "✅" if is_done else "⏳"
-        created_str = created_date.strftime("%Y-%m-%d %H:%M")
-        lines.append(f"{emoji} {esc(task_text)}  <i>({created_str})</i>")
+        created_str = created_date.isoformat(sep=" ", timespec="minutes")
+        lines.append(f"{emoji} {esc(clip(task_text, TASK_TEXT_CLIP))}  <i>({created_str})</i>")
         toggle_label = f"{'✅ Done' if not is_done else '↩️ Undo'}: {clip(task_text, 15)}"
-        toggle_cb = f"{'complete' if not is_done else 'undo'}_{task_id}"
+        # The page cursor rides along so the list re-renders where the user was
+        toggle_cb = f"{'complete' if not is_done else 'undo'}_{task_id}:{cursor}"
         delete_label = "🗑 Delete"
-        delete_cb = f"delete_{task_id}"
+        delete_cb = f"delete_{task_id}:{cursor}"
         keyboard.append([
             InlineKeyboardButton(toggle_label, callback_data=toggle_cb),
             InlineKeyboardButton(delete_label, callback_data=delete_cb),
@@ -565,37 +1182,49 @@ async def show_user_tasks_menu(update: Update, user_id: int, message=None):
     if update.effective_user.id == user_id:
         keyboard.insert(0, [InlineKeyboardButton("➕ New Task", callback_data="add_self_task")])
 
+    nav_row = []
+    if prev_cursor is not None:
+        nav_row.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"tasks_{user_id}:{prev_cursor}"))
+    if next_cursor is not None:
+        nav_row.append(InlineKeyboardButton("Next ➡️", callback_data=f"tasks_{user_id}:{next_cursor}"))
+    if nav_row:
+        keyboard.append(nav_row)
+
     keyboard.append([InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")])
     await safe_edit_or_send(update, "\n".join(lines), InlineKeyboardMarkup(keyboard), message)
 
-async def show_admin_users_menu(update: Update, message=None, page: int = 0, per_page: int = 8):
-    total_users = await run_db(_get_users_count_sync)
-    offset = page * per_page
-    users = await run_db(_get_all_users_sync, offset, per_page)
+async def show_admin_users_menu(update: Update, message=None, cursor: Optional[Tuple[int, int]] = None, per_page: int = 8):
+    users, prev_cursor, next_cursor = await run_db_shared(_get_users_page_sync, cursor, per_page)
+    if not users and cursor is not None:
+        # Cursor ran past the end (counts moved); fall back to the first page
+        users, prev_cursor, next_cursor = await run_db_shared(_get_users_page_sync, None, per_page)
 
     lines = ["👥 <b>User Management</b>\n"]
-    keyboard = []
-
-    for user_id, first_name, username, task_count, done_count in users:
-        uname = f"@{username}" if username else "no-username"
+    # Only first_name needs escaping: Telegram usernames are [A-Za-z0-9_] and
+    # the progress/id fields are digits.
+    for user_id, name, uname, task_count, done_count in users:
         progress = f"{done_count}/{task_count}" if task_count > 0 else "0"
         lines.append(
-            f"👤 <b>{esc(first_name) or str(user_id)}</b> ({esc(uname)})\n"
-            f"   📊 Progress: {esc(progress)} | 🆔: <code>{user_id}</code>\n"
-            f"   ─────────────────"
-        )
-        keyboard.append(
-            [
-                InlineKeyboardButton(f"👀 View {clip(first_name or str(user_id), 12)}", callback_data=f"view_user_{user_id}"),
-                InlineKeyboardButton("➕ New Task", callback_data=f"add_task_{user_id}"),
-            ]
+            f"👤 <b>{esc(name)}</b> ({uname})\n"
+            f"   📊 Progress: {progress} | 🆔: <code>{user_id}</code>\n"
+            f"{USER_ROW_DIVIDER}"
         )
 
+    # One row per user: [view, add task]
+    keyboard = [
+        [
+            InlineKeyboardButton(f"👀 View {clip(name, 12)}", callback_data=f"view_user_{user_id}"),
+            InlineKeyboardButton("➕ New Task", callback_data=f"add_task_{user_id}"),
+        ]
+        for user_id, name, *_ in users
+    ]
+
     nav_row = []
-    if page > 0:
-        nav_row.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"admin_users:{page-1}"))
-    if offset + per_page < total_users:
-        nav_row.append(InlineKeyboardButton("Next ➡️", callback_data=f"admin_users:{page+1}"))
+    # Cursor rides as admin_users_<user_id>:<task_count>
+    if prev_cursor:
+        nav_row.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"admin_users_{prev_cursor[1]}:{prev_cursor[0]}"))
+    if next_cursor:
+        nav_row.append(InlineKeyboardButton("Next ➡️", callback_data=f"admin_users_{next_cursor[1]}:{next_cursor[0]}"))
     if nav_row:
         keyboard.append(nav_row)
 
@@ -603,12 +1232,17 @@ async def show_admin_users_menu(update: Update, message=None, page: int = 0, per
     await safe_edit_or_send(update, "\n".join(lines), InlineKeyboardMarkup(keyboard), message)
 
 async def show_user_detail(update: Update, user_id: int, message=None):
-    tasks = await run_db(_get_user_tasks_sync, user_id)
-    user_tasks = [t for t in tasks if not t[2]]
+    is_env_protected = user_id in ADMINS_BY_ID  # ENV admins are protected
+    is_db_admin = None if is_env_protected else _ADMIN_CACHE.get(user_id)
+    if is_env_protected or is_db_admin is not None:
+        pending, user_tasks = await run_db_shared(_get_user_pending_sync, user_id)
+    else:
+        (pending, user_tasks), is_db_admin = await asyncio.gather(
+            run_db_shared(_get_user_pending_sync, user_id),
+            run_db(_is_admin_db_sync, user_id),
+        )
 
     # Admin toggle button
-    is_db_admin = await run_db(_is_admin_db_sync, user_id)
-    is_env_protected = user_id in ADMINS_BY_ID  # ENV admins are protected
     if is_env_protected:
         admin_btn = InlineKeyboardButton("🛡 Admin (ENV)", callback_data="noop")
     else:
@@ -617,11 +1251,13 @@ async def show_user_detail(update: Update, user_id: int, message=None):
             callback_data=f"toggle_admin_{user_id}"
         )
 
-    lines = [f"👤 <b>User Detail</b>\n", f"🆔 ID: <code>{user_id}</code>", f"📊 Active tasks: <b>{len(user_tasks)}</b>\n"]
+    lines = [f"👤 <b>User Detail</b>\n", f"🆔 ID: <code>{user_id}</code>", f"📊 Active tasks: <b>{pending}</b>\n"]
     if user_tasks:
         lines.append("📋 <b>Pending tasks:</b>")
         for i, t in enumerate(user_tasks, 1):
             lines.append(f"{i}. {esc(t[1])}")
+        if pending > len(user_tasks):
+            lines.append(f"… and {pending - len(user_tasks)} more")
     else:
         lines.append("🎉 All tasks are done.")
 
@@ -636,9 +1272,11 @@ async def show_user_detail(update: Update, user_id: int, message=None):
 
 async def show_admins_menu(update: Update, message=None):
     """Show current admins: ENV (protected) + DB (removable)."""
-    db_admins = await run_db(_get_admins_db_detailed_sync)
-    env_ids = sorted(list(ADMINS_BY_ID))
-    env_infos = await run_db(_get_users_info_sync, env_ids)
+    env_ids = sorted(ADMINS_BY_ID)
+    db_admins, env_infos = await asyncio.gather(
+        run_db(_get_admins_db_detailed_sync),
+        run_db(_get_users_info_sync, env_ids),
+    )
 
     lines = ["🔧 <b>Admins</b>\n"]
 
@@ -654,7 +1292,7 @@ async def show_admins_menu(update: Update, message=None):
         lines.append("🧩 <b>DB Admins</b>")
         for uid, first_name, username, added_by, added_at in db_admins:
             label = f"{esc(first_name) or uid} ({'@'+username if username else 'no-username'})"
-            meta = f"added_by={added_by} at {added_at.strftime('%Y-%m-%d %H:%M') if added_at else '-'}"
+            meta = f"added_by={added_by} at {added_at.isoformat(sep=' ', timespec='minutes') if added_at else '-'}"
             lines.append(f"• {label} — <i>{meta}</i>")
         lines.append("")
     else:
@@ -667,7 +1305,7 @@ async def show_admins_menu(update: Update, message=None):
     await safe_edit_or_send(update, "\n".join(lines), InlineKeyboardMarkup(keyboard), message)
 
 async def show_stats(update: Update, message=None):
-    users_cnt, tasks_cnt, done_cnt = await run_db(_get_global_stats_sync)
+    users_cnt, tasks_cnt, done_cnt, top = await run_db_shared(_get_stats_sync, 5)
     pending = tasks_cnt - done_cnt
     progress = round((done_cnt / tasks_cnt) * 100, 1) if tasks_cnt > 0 else 0.0
 
@@ -679,52 +1317,23 @@ async def show_stats(update: Update, message=None):
         f"⏳ Pending: <b>{pending}</b>",
         f"📈 Progress: <b>{progress}%</b>\n",
     ]
-    users = await run_db(_get_all_users_sync, 0, 50)
-    top = []
-    for uid, first_name, username, task_count, done_cnt_u in users:
-        if task_count > 0:
-            pct = round(done_cnt_u * 100.0 / task_count, 1)
-            top.append((pct, first_name or str(uid)))
-    top.sort(reverse=True)
     if top:
         lines.append("🏆 <b>Top users:</b>")
-        for i, (pct, name) in enumerate(top[:5], 1):
+        for i, (name, pct) in enumerate(top, 1):
             lines.append(f"{i}. {esc(name)} — {pct}%")
 
-    keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="main_menu")]]
-    await safe_edit_or_send(update, "\n".join(lines), InlineKeyboardMarkup(keyboard), message)
+    await safe_edit_or_send(update, "\n".join(lines), BACK_TO_MENU_KEYBOARD, message)
 
 async def show_help(update: Update, message=None):
-    text = (
-        "ℹ️ <b>Task Manager Bot — Help</b>\n\n"
-        "🎯 <b>Users:</b>\n"
-        "• ✅ My Tasks — view & toggle tasks\n"
-        "• ➕ New Task — add a task for yourself\n"
-        "• 📊 My Status — quick stats\n"
-        "• ⚙️ Settings — mute reminders & working hours\n\n"
-        "👑 <b>Admins:</b>\n"
-        "• 👥 Manage Users — browse users, add tasks\n"
-        "• 🔧 Admins — view/add/remove DB admins\n"
-        "• 📊 Global Stats — overall metrics\n\n"
-        "⌨️ <b>Commands:</b>\n"
-        "/start — main menu\n"
-        "/mytasks — my tasks\n"
-        "/add — add a new task for yourself\n"
-        "/users — user management (admins)\n"
-        "/admins — admins overview (admins)\n"
-        "/settings — user settings\n"
-        "/whoami — show your Telegram info\n"
-        "/amadmin — check admin recognition\n"
-    )
-    keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="main_menu")]]
-    await safe_edit_or_send(update, text, InlineKeyboardMarkup(keyboard), message)
+    await safe_edit_or_send(update, HELP_TEXT, BACK_TO_MENU_KEYBOARD, message)
 
 # =============================
 # Settings UI
 # =============================
-async def show_settings_menu(update: Update, message=None):
+async def show_settings_menu(update: Update, message=None, settings: Optional[Tuple[bool, int, int]] = None):
+    """Render settings; pass `settings` when the caller already has the fresh row."""
     u = update.effective_user
-    mute, start_h, end_h = await run_db(_get_user_settings_sync, u.id)
+    mute, start_h, end_h = settings or await run_db_shared(_get_user_settings_sync, u.id)
     state = "ON 🔕" if mute else "OFF 🔔"
     tz_line = f"Time zone: <code>{esc(TZ_NAME)}</code>"
     hours_line = f"Working hours: <b>{start_h:02d}:00–{end_h:02d}:00</b>" if not (start_h == 0 and end_h == 24) else "Working hours: <b>24/7</b>"
@@ -746,8 +1355,8 @@ async def show_settings_menu(update: Update, message=None):
             InlineKeyboardButton("End +1h ⏭", callback_data="end_inc"),
         ],
         [
-            InlineKeyboardButton("Preset 9–21", callback_data="preset_9_21"),
-            InlineKeyboardButton("Preset 24/7", callback_data="preset_24_7"),
+            InlineKeyboardButton("Preset 9–21", callback_data="preset_office"),
+            InlineKeyboardButton("Preset 24/7", callback_data="preset_always"),
         ],
         [InlineKeyboardButton("🔙 Back", callback_data="main_menu")],
     ]
@@ -756,172 +1365,204 @@ async def show_settings_menu(update: Update, message=None):
 # =============================
 # Message/Callback helpers for delete
 # =============================
-def _task_owner_sync(task_id: int) -> Optional[int]:
-    """Return the user_id who owns the task, or None if not found."""
-    with _get_conn() as conn, conn.cursor() as c:
-        c.execute("SELECT user_id FROM tasks WHERE task_id=%s", (task_id,))
-        row = c.fetchone()
-        return row[0] if row else None
-
-def _delete_task_owner_or_admin_sync(task_id: int, requester_id: int, is_admin: bool) -> bool:
+def _delete_task_and_page_sync(task_id: int, requester_id: int, is_admin: bool, cursor: int):
     """
-    Delete a task if:
-      - requester is the owner of the task, OR
-      - requester is admin (DB or ENV).
-    Returns True if a row was deleted.
+    Delete a task if the requester owns it or is an admin (DB or ENV), then read
+    the affected list's page in the same transaction, so the refresh can never
+    show the deleted row. Return (deleted, list_owner_id, task_page); the list is
+    the task owner's when an admin deleted it, otherwise the requester's.
     """
     with _get_conn() as conn, conn.cursor() as c:
-        # Try delete as the owner
-        c.execute("DELETE FROM tasks WHERE task_id=%s AND user_id=%s", (task_id, requester_id))
-        if c.rowcount > 0:
-            return True
-        # If not owner, allow admins to delete any
-        if is_admin:
-            c.execute("DELETE FROM tasks WHERE task_id=%s", (task_id,))
-            return c.rowcount > 0
-        return False
+        c.execute(
+            "DELETE FROM tasks WHERE task_id = %s AND (user_id = %s OR %s) RETURNING user_id",
+            (task_id, requester_id, is_admin),
+        )
+        row = c.fetchone()
+        list_owner_id = row[0] if row else requester_id
+        task_page = _fetch_task_page(c, list_owner_id, cursor)
+    if row:
+        _TASKS_CACHE.pop(list_owner_id)
+    return row is not None, list_owner_id, task_page
 
 # =============================
 # Callbacks / Messages
 # =============================
-async def button_click(update: Update, context: ContextTypes.DEFAULT_TYPE):
+def _parse_callback(data: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """Split '<action>[_<id>][:<arg>]' into (action, id, arg) in a single pass."""
+    head, _, tail = data.partition(":")
+    action, _, ident = head.rpartition("_")
+    if not ident.isdigit():
+        action, ident = head, ""
+    return action, (int(ident) if ident else None), (int(tail) if tail else None)
+
+async def _cb_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_main_menu(update, context, update.callback_query.message)
+
+async def _cb_my_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
     query = update.callback_query
-    user_id = query.from_user.id
-    username = query.from_user.username
-    data = query.data
+    await show_user_tasks_menu(update, query.from_user.id, query.message)
 
-    await query.answer()
+async def _cb_add_self_task(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    context.user_data["adding_self_task"] = True
+    await update.callback_query.message.edit_text(
+        "✏️ Send the task text to add it to <b>your</b> list (one task per line):",
+        parse_mode=ParseMode.HTML,
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="my_tasks")]]),
+        disable_web_page_preview=True,
+    )
 
-    # Clear state on navigation
-    if data in ("main_menu", "admin_stats", "help", "settings", "admins_menu") or data.startswith("admin_users"):
-        context.user_data.pop("target_user_id", None)
-        context.user_data.pop("awaiting_admin_id", None)
-        context.user_data.pop("adding_self_task", None)
+async def _cb_admin_users(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    cursor = (arg or 0, ident) if ident is not None else None
+    await show_admin_users_menu(update, update.callback_query.message, cursor=cursor)
 
-    if data == "main_menu":
-        await show_main_menu(update, context, query.message)
+async def _cb_admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_stats(update, update.callback_query.message)
 
-    elif data == "my_tasks":
-        await show_user_tasks_menu(update, user_id, query.message)
+async def _cb_admins_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_admins_menu(update, update.callback_query.message)
 
-    elif data == "add_self_task":
-        context.user_data["adding_self_task"] = True
-        await query.message.edit_text(
-            "✏️ Send the task text to add it to <b>your</b> list:",
-            parse_mode=ParseMode.HTML,
-            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="my_tasks")]]),
-            disable_web_page_preview=True,
-        )
+async def _cb_admin_add_by_id(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    context.user_data["awaiting_admin_id"] = True
+    await update.callback_query.message.edit_text(
+        "👤 Send the numeric <b>Telegram user ID</b> to grant admin.\nExample: <code>123456789</code>",
+        parse_mode=ParseMode.HTML,
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="admins_menu")]]),
+        disable_web_page_preview=True,
+    )
 
-    elif data.startswith("admin_users"):
-        if await is_admin_async(user_id, username):
-            page = 0
-            if ":" in data:
-                _, p = data.split(":")
-                page = int(p)
-            await show_admin_users_menu(update, query.message, page=page)
-        else:
-            await query.message.reply_text("❌ Access denied.")
+async def _cb_help(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_help(update, update.callback_query.message)
 
-    elif data == "admin_stats":
-        if await is_admin_async(user_id, username):
-            await show_stats(update, query.message)
-        else:
-            await query.message.reply_text("❌ Access denied.")
+async def _cb_settings(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_settings_menu(update, update.callback_query.message)
 
-    elif data == "admins_menu":
-        if await is_admin_async(user_id, username):
-            await show_admins_menu(update, query.message)
-        else:
-            await query.message.reply_text("❌ Access denied.")
-
-    elif data == "admin_add_by_id":
-        if await is_admin_async(user_id, username):
-            context.user_data["awaiting_admin_id"] = True
-            await query.message.edit_text(
-                "👤 Send the numeric <b>Telegram user ID</b> to grant admin.\nExample: <code>123456789</code>",
-                parse_mode=ParseMode.HTML,
-                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="admins_menu")]]),
-                disable_web_page_preview=True,
-            )
-        else:
-            await query.message.reply_text("❌ Access denied.")
+async def _cb_toggle_mute(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    query = update.callback_query
+    settings = await run_db(_toggle_mute_sync, query.from_user.id)
+    await show_settings_menu(update, query.message, settings=settings)
+
+def _cb_bump_hour(field: str, delta: int):
+    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+        query = update.callback_query
+        settings = await run_db(_bump_hour_setting_sync, query.from_user.id, field, delta)
+        await show_settings_menu(update, query.message, settings=settings)
+    return handler
+
+def _cb_preset_hours(start_h: int, end_h: int):
+    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+        query = update.callback_query
+        settings = await run_db(_update_user_settings_sync, query.from_user.id, None, start_h, end_h)
+        await show_settings_menu(update, query.message, settings=settings)
+    return handler
+
+async def _cb_toggle_task(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    query = update.callback_query
+    user_id = query.from_user.id
+    cursor = arg or 0
+    task_page = await run_db(_toggle_task_and_page_sync, ident, user_id, cursor)
+    await show_user_tasks_menu(update, user_id, query.message, cursor=cursor, task_page=task_page)
 
-    elif data == "my_stats":
-        await show_user_tasks_menu(update, user_id, query.message)
+async def _cb_view_user(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_user_detail(update, ident, update.callback_query.message)
 
-    elif data == "help":
-        await show_help(update, query.message)
+async def _cb_toggle_admin(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    query = update.callback_query
+    if ident in ADMINS_BY_ID:
+        await query.message.reply_text("🛡 This admin is protected by ENV and cannot be removed.")
+    else:
+        if await run_db(_is_admin_db_sync, ident):
+            await run_db(_remove_admin_sync, ident)
+            await query.message.reply_text(f"✅ Admin revoked for <code>{ident}</code>.", parse_mode=ParseMode.HTML)
+        else:
+            await run_db(_add_admin_sync, ident, query.from_user.id)
+            await query.message.reply_text(f"✅ Admin granted to <code>{ident}</code>.", parse_mode=ParseMode.HTML)
+    await show_user_detail(update, ident, query.message)
+
+async def _cb_add_task(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    context.user_data["target_user_id"] = ident
+    await update.callback_query.message.edit_text(
+        f"✏️ Send task text for user ID <code>{ident}</code> (one task per line):",
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="admin_users:0")]]),
+        parse_mode=ParseMode.HTML,
+        disable_web_page_preview=True,
+    )
 
-    elif data == "settings":
-        await show_settings_menu(update, query.message)
+async def _cb_view_all_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    await show_user_tasks_menu(update, ident, update.callback_query.message)
 
-    elif data.startswith("complete_"):
-        task_id = int(data.split("_")[1])
-        await run_db(_toggle_task_sync, task_id, user_id)
-        await show_user_tasks_menu(update, user_id, query.message)
+async def _cb_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    query = update.callback_query
+    user = query.from_user
+    if ident == user.id or await is_admin_async(user.id, user.username):
+        await show_user_tasks_menu(update, ident, query.message, cursor=arg or 0)
+    else:
+        await query.message.reply_text("❌ Access denied.")
 
-    elif data.startswith("undo_"):
-        task_id = int(data.split("_")[1])
-        await run_db(_toggle_task_sync, task_id, user_id)
-        await show_user_tasks_menu(update, user_id, query.message)
+async def _cb_delete(update: Update, context: ContextTypes.DEFAULT_TYPE, ident, arg):
+    query = update.callback_query
+    user = query.from_user
+    cursor = arg or 0
+    is_admin = await is_admin_async(user.id, user.username)
+    deleted, list_owner_id, task_page = await run_db(_delete_task_and_page_sync, ident, user.id, is_admin, cursor)
+    if deleted:
+        await query.answer("✅ Task deleted", show_alert=False)
+    else:
+        await query.answer("⚠️ Not allowed or task not found", show_alert=True)
+    await show_user_tasks_menu(update, list_owner_id, query.message, cursor=cursor, task_page=task_page)
+
+# action -> handler; built once so a click costs one parse and one dict lookup
+_CALLBACK_HANDLERS = {
+    "main_menu": _cb_main_menu,
+    "my_tasks": _cb_my_tasks,
+    "my_stats": _cb_my_tasks,
+    "add_self_task": _cb_add_self_task,
+    "admin_users": _cb_admin_users,
+    "admin_stats": _cb_admin_stats,
+    "admins_menu": _cb_admins_menu,
+    "admin_add_by_id": _cb_admin_add_by_id,
+    "help": _cb_help,
+    "settings": _cb_settings,
+    "toggle_mute": _cb_toggle_mute,
+    "start_dec": _cb_bump_hour("work_start", -1),
+    "start_inc": _cb_bump_hour("work_start", +1),
+    "end_dec": _cb_bump_hour("work_end", -1),
+    "end_inc": _cb_bump_hour("work_end", +1),
+    "preset_office": _cb_preset_hours(9, 21),
+    "preset_always": _cb_preset_hours(0, 24),
+    "complete": _cb_toggle_task,
+    "undo": _cb_toggle_task,
+    "view_user": _cb_view_user,
+    "toggle_admin": _cb_toggle_admin,
+    "add_task": _cb_add_task,
+    "view_all_tasks": _cb_view_all_tasks,
+    "tasks": _cb_tasks,
+    "delete": _cb_delete,
+}
+_ADMIN_ONLY_ACTIONS = frozenset({
+    "admin_users", "admin_stats", "admins_menu", "admin_add_by_id",
+    "view_user", "toggle_admin", "add_task", "view_all_tasks",
+})
+_NAV_ACTIONS = frozenset({"main_menu", "admin_stats", "help", "settings", "admins_menu", "admin_users"})
 
-    elif data.startswith("view_user_"):
-        if await is_admin_async(user_id, username):
-            target_user_id = int(data.split("_")[2])
-            await show_user_detail(update, target_user_id, query.message)
-        else:
-            await query.message.reply_text("❌ Access denied.")
-
-    elif data.startswith("toggle_admin_"):
-        if await is_admin_async(user_id, username):
-            target_user_id = int(data.split("_")[2])
-            if target_user_id in ADMINS_BY_ID:
-                await query.message.reply_text("🛡 This admin is protected by ENV and cannot be removed.")
-            else:
-                if await run_db(_is_admin_db_sync, target_user_id):
-                    await run_db(_remove_admin_sync, target_user_id)
-                    await query.message.reply_text(f"✅ Admin revoked for <code>{target_user_id}</code>.", parse_mode=ParseMode.HTML)
-                else:
-                    await run_db(_add_admin_sync, target_user_id, user_id)
-                    await query.message.reply_text(f"✅ Admin granted to <code>{target_user_id}</code>.", parse_mode=ParseMode.HTML)
-            await show_user_detail(update, target_user_id, query.message)
-        else:
-            await query.message.reply_text("❌ Access denied.")
+async def button_click(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    action, ident, arg = _parse_callback(query.data)
 
-    elif data.startswith("add_task_"):
-        if await is_admin_async(user_id, username):
-            target_user_id = int(data.split("_")[2])
-            context.user_data["target_user_id"] = target_user_id
-            await query.message.edit_text(
-                f"✏️ Send task text for user ID <code>{target_user_id}</code>:",
-                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Cancel", callback_data="admin_users:0")]]),
-                parse_mode=ParseMode.HTML,
-                disable_web_page_preview=True,
-            )
-        else:
-            await query.message.reply_text("❌ Access denied.")
+    await query.answer()
 
-    elif data.startswith("view_all_tasks_"):
-        if await is_admin_async(user_id, username):
-            target_user_id = int(data.split("_")[3])
-            await show_user_tasks_menu(update, target_user_id, query.message)
-        else:
-            await query.message.reply_text("❌ Access denied.")
-
-    elif data.startswith("delete_"):
-        # Delete flow: determine owner (before delete) for proper refresh if admin
-        task_id = int(data.split("_")[1])
-        is_admin = await is_admin_async(user_id, username)
-        owner_id = await run_db(_task_owner_sync, task_id)
-        deleted = await run_db(_delete_task_owner_or_admin_sync, task_id, user_id, is_admin)
-        if deleted:
-            await query.answer("✅ Task deleted", show_alert=False)
-        else:
-            await query.answer("⚠️ Not allowed or task not found", show_alert=True)
+    # Clear state on navigation
+    if action in _NAV_ACTIONS:
+        context.user_data.pop("target_user_id", None)
+        context.user_data.pop("awaiting_admin_id", None)
+        context.user_data.pop("adding_self_task", None)
 
-        target_refresh_id = owner_id if (owner_id and is_admin) else user_id
-        await show_user_tasks_menu(update, target_refresh_id, query.message)
+    handler = _CALLBACK_HANDLERS.get(action)
+    if handler is None:
+        return
+    if action in _ADMIN_ONLY_ACTIONS and not await is_admin_async(query.from_user.id, query.from_user.username):
+        await query.message.reply_text("❌ Access denied.")
+        return
+    await handler(update, context, ident, arg)
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -932,22 +1573,24 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     u = update.effective_user
     text = (update.message.text or "").strip()
+    # Updates run concurrently, so each flow claims its flag before the first
+    # await; a second quick message then falls through instead of repeating it.
+    # Early returns that keep the flow open put the flag back.
 
     # Admin: add admin by ID
-    if context.user_data.get("awaiting_admin_id"):
+    if context.user_data.pop("awaiting_admin_id", None):
         if not await is_admin_async(u.id, u.username):
             await update.message.reply_text("❌ Access denied.")
-            context.user_data.pop("awaiting_admin_id", None)
             return
         try:
             target_id = int(text)
         except ValueError:
+            context.user_data["awaiting_admin_id"] = True
             await update.message.reply_text("⚠️ Please send a numeric Telegram user ID.")
             return
         # Ensure user exists in users table (create stub if needed)
         await run_db(_ensure_user_and_settings_sync, target_id, None, None, None)
         await run_db(_add_admin_sync, target_id, u.id)
-        context.user_data.pop("awaiting_admin_id", None)
         await update.message.reply_text(
             f"✅ Admin granted to <code>{target_id}</code>.",
             parse_mode=ParseMode.HTML,
@@ -957,32 +1600,44 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Admin: add task to a target user
-    if "target_user_id" in context.user_data:
+    target_user_id = context.user_data.pop("target_user_id", None)
+    if target_user_id is not None:
+        # One task per non-empty line, so admins can paste a whole list
+        texts = [line.strip() for line in text.splitlines() if line.strip()]
+        if not texts:
+            context.user_data["target_user_id"] = target_user_id
+            await update.message.reply_text("❗ Task text is empty.")
+            return
         if not await is_admin_async(u.id, u.username):
             await update.message.reply_text("❌ Access denied.")
             return
-        target_user_id = context.user_data["target_user_id"]
-        if not text:
-            await update.message.reply_text("❗ Task text is empty.")
-            return
-        await run_db(_add_task_sync, u.id, target_user_id, text)
-        context.user_data.pop("target_user_id", None)
+        if len(texts) == 1:
+            await run_db(_add_task_sync, u.id, target_user_id, texts[0])
+        else:
+            await run_db(_add_tasks_bulk_sync, u.id, [(target_user_id, t) for t in texts])
         await update.message.reply_text(
-            f"✅ Task added for <code>{target_user_id}</code>.\n📝 {esc(text)}",
+            f"✅ {len(texts)} task(s) added for <code>{target_user_id}</code>.\n"
+            + "\n".join(f"📝 {esc(t)}" for t in texts),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True,
         )
         return
 
     # User: add task for themselves
-    if context.user_data.get("adding_self_task"):
-        if not text:
+    if context.user_data.pop("adding_self_task", None):
+        # Same one-task-per-line batching as the admin flow
+        texts = [line.strip() for line in text.splitlines() if line.strip()]
+        if not texts:
+            context.user_data["adding_self_task"] = True
             await update.message.reply_text("❗ Task text is empty.")
             return
-        await run_db(_add_task_sync, u.id, u.id, text)
-        context.user_data.pop("adding_self_task", None)
+        if len(texts) == 1:
+            await run_db(_add_task_sync, u.id, u.id, texts[0])
+        else:
+            await run_db(_add_tasks_bulk_sync, u.id, [(u.id, t) for t in texts])
         await update.message.reply_text(
-            f"✅ Task added to <b>your</b> list.\n📝 {esc(text)}",
+            f"✅ {len(texts)} task(s) added to <b>your</b> list.\n"
+            + "\n".join(f"📝 {esc(t)}" for t in texts),
             parse_mode=ParseMode.HTML,
             disable_web_page_preview=True,
             reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Open My Tasks", callback_data="my_tasks")]])
@@ -1001,73 +1656,51 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def job_send_reminders(context: ContextTypes.DEFAULT_TYPE):
     """Every 2 hours: ping users with pending tasks, respecting settings."""
     try:
-        pending_list = await run_db(_get_pending_grouped_sync, 5)
-        settings_map = await run_db(_get_all_settings_map_sync)
+        pending_list = await run_db(_get_pending_grouped_sync, datetime.now(tz=TZ).hour, 5)
         bot = context.application.bot
-        now_local = datetime.now(tz=TZ)
 
+        messages = []
         for user_id, count_pending, samples in pending_list:
-            mute, w_start, w_end = settings_map.get(user_id, (False, 9, 21))
-            if mute or not _within_hours(now_local, w_start, w_end):
-                continue
-            try:
-                lines = [
-                    f"⏰ <b>Reminder</b>",
-                    f"You have <b>{count_pending}</b> pending task(s).",
-                ]
-                if samples:
-                    lines.append("Top items:")
-                    for s in samples:
-                        lines.append(f"• {esc(s)}")
-                keyboard = InlineKeyboardMarkup([
-                    [InlineKeyboardButton("Open My Tasks", callback_data="my_tasks")],
-                    [InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
-                ])
-                await bot.send_message(
-                    chat_id=user_id,
-                    text="\n".join(lines),
-                    reply_markup=keyboard,
-                    parse_mode=ParseMode.HTML,
-                    disable_web_page_preview=True,
-                )
-            except (Forbidden, BadRequest):
-                continue
+            text = f"⏰ <b>Reminder</b>\nYou have <b>{count_pending}</b> pending task(s)."
+            if samples:
+                text += "\nTop items:\n" + "\n".join(f"• {esc(s)}" for s in samples)
+            messages.append((user_id, text))
+
+        await send_many(
+            bot,
+            messages,
+            reply_markup=REMINDER_KEYBOARD,
+            parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True,
+        )
     except Exception:
         pass
 
 async def job_midnight_rollover(context: ContextTypes.DEFAULT_TYPE):
     """At local midnight: send daily performance report (for yesterday), then reset daily tasks."""
     try:
-        report = await run_db(_collect_yesterday_report_and_reset_sync, TZ_NAME)
+        report, total_users = await run_db(_collect_yesterday_report_and_reset_sync, TZ_NAME)
         bot = context.application.bot
 
+        y_date = (datetime.now(tz=TZ).date() - timedelta(days=1)).strftime("%Y-%m-%d")
+        messages = []
+        total_completed = total_tasks = 0
         for user_id, total_daily, completed_y in report:
-            try:
-                pct = round((completed_y / total_daily) * 100, 1) if total_daily > 0 else 0.0
-                now_local = datetime.now(tz=TZ)
-                y_date = (now_local.date() - timedelta(days=1)).strftime("%Y-%m-%d")
-                text = (
-                    f"📅 <b>Daily Report — {y_date}</b>\n"
-                    f"✅ Completed: <b>{completed_y}</b>\n"
-                    f"📝 Total daily tasks: <b>{total_daily}</b>\n"
-                    f"📈 Performance: <b>{pct}%</b>\n\n"
-                    f"🔄 New day started — tasks refreshed."
-                )
-                await bot.send_message(
-                    chat_id=user_id,
-                    text=text,
-                    parse_mode=ParseMode.HTML,
-                    disable_web_page_preview=True,
-                )
-            except (Forbidden, BadRequest):
-                continue
+            total_completed += completed_y
+            total_tasks += total_daily
+            pct = round((completed_y / total_daily) * 100, 1) if total_daily > 0 else 0.0
+            messages.append((
+                user_id,
+                f"📅 <b>Daily Report — {y_date}</b>\n"
+                f"✅ Completed: <b>{completed_y}</b>\n"
+                f"📝 Total daily tasks: <b>{total_daily}</b>\n"
+                f"📈 Performance: <b>{pct}%</b>\n\n"
+                f"🔄 New day started — tasks refreshed.",
+            ))
+        await send_many(bot, messages, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
 
         # Optional: send an aggregate summary to ENV admins
-        admins = list(ADMINS_BY_ID)
-        if admins:
-            total_users = await run_db(_get_users_count_sync)
-            total_completed = sum(x[2] for x in report)
-            total_tasks = sum(x[1] for x in report)
+        if ADMINS_BY_ID:
             pct_all = round((total_completed / total_tasks) * 100, 1) if total_tasks > 0 else 0.0
             summary = (
                 f"🧾 <b>Daily Summary</b>\n"
@@ -1076,67 +1709,47 @@ async def job_midnight_rollover(context: ContextTypes.DEFAULT_TYPE):
                 f"📝 Total daily tasks: <b>{total_tasks}</b>\n"
                 f"📈 Performance: <b>{pct_all}%</b>"
             )
-            for admin_id in admins:
-                try:
-                    await context.application.bot.send_message(
-                        chat_id=admin_id,
-                        text=summary,
-                        parse_mode=ParseMode.HTML,
-                        disable_web_page_preview=True,
-                    )
-                except (Forbidden, BadRequest):
-                    continue
-    except Exception:
-        pass
-
-def _seconds_until_next_even_hour(now_local: datetime) -> float:
-    """Seconds until the next even-hour at minute 00 in local TZ."""
-    hour = now_local.hour
-    next_hour = (hour + (2 - (hour % 2))) % 24
-    day = now_local.date()
-    if next_hour <= hour:
-        day = day + timedelta(days=1)
-    candidate = datetime.combine(day, time(next_hour, 0), tzinfo=TZ)
-    delta = (candidate - now_local).total_seconds()
-    return max(1.0, delta)
-
-def _seconds_until_local(h: int, m: int, now_local: Optional[datetime] = None) -> float:
-    now_local = now_local or datetime.now(tz=TZ)
-    candidate = datetime.combine(now_local.date(), time(h, m), tzinfo=TZ)
-    if candidate <= now_local:
-        candidate = candidate + timedelta(days=1)
-    return max(1.0, (candidate - now_local).total_seconds())
-
-async def _reminders_loop(app: Application):
-    """AsyncIO loop: reminders every 2 hours at :00 local time."""
-    print("[SCHED] AsyncIO reminders loop active")
-    ctx = SimpleNamespace(application=app)
-    while True:
-        now_local = datetime.now(tz=TZ)
-        sleep_sec = _seconds_until_next_even_hour(now_local)
-        await asyncio.sleep(sleep_sec)
-        try:
-            await job_send_reminders(ctx)
-        except Exception:
-            pass
-
-async def _midnight_loop(app: Application):
-    """AsyncIO loop: daily rollover at 00:00 local time."""
-    print("[SCHED] AsyncIO midnight loop active")
+            await send_many(
+                bot,
+                [(admin_id, summary) for admin_id in ADMINS_BY_ID],
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+            )
+    except Exception as e:
+        # A failed rollover means no reports and no reset today; make it visible
+        print(f"[SCHED] Midnight rollover failed: {e!r}")
+
+def _next_even_hour(after: datetime) -> datetime:
+    """Next even hour at minute 00 in local TZ, strictly after `after`."""
+    base = after.replace(minute=0, second=0, microsecond=0)
+    return base + timedelta(hours=2 - after.hour % 2)
+
+def _next_local_midnight(after: datetime) -> datetime:
+    """Next 00:00 in local TZ, strictly after `after`."""
+    return datetime.combine(after.date() + timedelta(days=1), time(0, 0), tzinfo=TZ)
+
+async def _job_loop(app: Application, name: str, job, next_fire):
+    """AsyncIO loop: run `job` at each wall-clock time produced by `next_fire`."""
+    print(f"[SCHED] AsyncIO {name} loop active")
     ctx = SimpleNamespace(application=app)
     while True:
-        sleep_sec = _seconds_until_local(0, 0)  # run exactly at 00:00 local time
-        await asyncio.sleep(sleep_sec)
+        due = next_fire(datetime.now(tz=TZ))
+        # asyncio.sleep can wake slightly early; never fire before the deadline,
+        # otherwise the next deadline would land a moment later and the job run twice
+        while (delay := (due - datetime.now(tz=TZ)).total_seconds()) > 0:
+            await asyncio.sleep(delay)
         try:
-            await job_midnight_rollover(ctx)
+            await job(ctx)
         except Exception:
             pass
 
 def _schedule_asyncio_loops(app: Application):
     """Start background loops (no PTB JobQueue required)."""
     loop = asyncio.get_running_loop()
-    loop.create_task(_reminders_loop(app), name="reminders_loop")
-    loop.create_task(_midnight_loop(app), name="midnight_loop")
+    # Reminders every 2 hours at :00 local time
+    loop.create_task(_job_loop(app, "reminders", job_send_reminders, _next_even_hour), name="reminders_loop")
+    # Daily rollover at 00:00 local time
+    loop.create_task(_job_loop(app, "midnight", job_midnight_rollover, _next_local_midnight), name="midnight_loop")
 
 # =============================
 # Error handling
@@ -1159,17 +1772,32 @@ async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE):
 # App bootstrap
 # =============================
 async def _post_init(app: Application):
+    await run_db(_open_pool_sync)
     await run_db(_init_db_sync)
     print(f"[BOOT] TZ={TZ_NAME}")
     print(f"[BOOT] Admin IDs (ENV): {sorted(ADMINS_BY_ID)}")
     print(f"[BOOT] Admin Usernames (ENV): {sorted(ADMINS_BY_USERNAME)}")
     _schedule_asyncio_loops(app)
 
+async def _post_shutdown(app: Application):
+    await run_db(_close_pool_sync)
+
+def _install_uvloop():
+    """Use uvloop's faster event loop when it is installed (Linux/macOS)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    print("[BOOT] Event loop: uvloop")
+
 def main():
-    application = Application.builder().token(BOT_TOKEN).build()
+    _install_uvloop()
+    application = Application.builder().token(BOT_TOKEN).concurrent_updates(CONCURRENT_UPDATES).build()
 
     # Initialize DB and start background schedulers after init
     application.post_init = _post_init
+    application.post_shutdown = _post_shutdown
 
     # Commands
     application.add_handler(CommandHandler("start", start))